@@ -0,0 +1,96 @@
+/**
+ * Persistent gltf-transform worker
+ *
+ * Started once by handler.py and kept alive for the life of the RunPod worker,
+ * so Node.js startup and module loading are paid once instead of per job.
+ *
+ * Protocol: one JSON job per line on stdin, one JSON result per line on stdout.
+ *   -> {"steps": [{"command": "weld", "args": []},
+ *                 {"command": "simplify", "args": ["--ratio", "0.10"]}],
+ *       "input": "/in.glb", "output": "/out.glb"}
+ *   <- @gltf-worker {"ok": true} | @gltf-worker {"ok": false, "error": "..."}
+ *
+ * Steps and flags mirror the gltf-transform CLI (weld, simplify, resize). All
+ * steps of a job run on one in-memory document: the GLB is read and written once.
+ * Replies carry the REPLY_PREFIX frame so the handler can tell them apart from any
+ * stray output; console.log/info (and gltf-transform's logger) go to stderr.
+ */
+
+import readline from "node:readline";
+import { Logger, NodeIO } from "@gltf-transform/core";
+import { ALL_EXTENSIONS } from "@gltf-transform/extensions";
+import { simplify, textureCompress, weld } from "@gltf-transform/functions";
+import { MeshoptDecoder, MeshoptEncoder, MeshoptSimplifier } from "meshoptimizer";
+import sharp from "sharp";
+
+const REPLY_PREFIX = "@gltf-worker ";
+
+// Keep stdout for framed replies only: library logging would otherwise land there
+console.log = console.info = console.debug = (...args) => console.error(...args);
+
+await Promise.all([MeshoptDecoder.ready, MeshoptEncoder.ready, MeshoptSimplifier.ready]);
+
+const io = new NodeIO().registerExtensions(ALL_EXTENSIONS).registerDependencies({
+  "meshopt.decoder": MeshoptDecoder,
+  "meshopt.encoder": MeshoptEncoder,
+});
+// Documents read through io inherit its logger; INFO summaries (e.g. from prune) are noise here
+io.setLogger(new Logger(Logger.Verbosity.WARN));
+
+// Parse CLI-style flags (["--ratio", "0.10"]) into {ratio: 0.1}
+function parseArgs(args = []) {
+  const options = {};
+  for (let i = 0; i < args.length; i += 2) {
+    options[args[i].replace(/^--/, "")] = Number(args[i + 1]);
+  }
+  return options;
+}
+
+const TRANSFORMS = {
+  weld: () => [weld()],
+  simplify: ({ ratio = 0.5, error = 0.001 }) => [
+    simplify({ simplifier: MeshoptSimplifier, ratio, error }),
+  ],
+  resize: ({ width, height }) => [
+    textureCompress({ encoder: sharp, resize: [width, height] }),
+  ],
+};
+
+async function runJob({ steps, input, output }) {
+  const transforms = steps.flatMap(({ command, args }) => {
+    const make = TRANSFORMS[command];
+    if (!make) {
+      throw new Error(`Unsupported command: ${command}`);
+    }
+    return make(parseArgs(args));
+  });
+  const document = await io.read(input);
+  await document.transform(...transforms);
+  await io.write(output, document);
+}
+
+// Jobs are handled strictly one at a time, in arrival order
+let queue = Promise.resolve();
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on("line", (line) => {
+  if (!line.trim()) return;
+  queue = queue.then(async () => {
+    let result;
+    try {
+      const job = JSON.parse(line);
+      const start = Date.now();
+      await runJob(job);
+      const label = job.steps.map((step) => step.command).join("+");
+      console.error(`[gltf-worker] ${label} ${job.input} -> ${job.output} (${Date.now() - start}ms)`);
+      result = { ok: true };
+    } catch (err) {
+      result = { ok: false, error: String(err && err.stack ? err.stack : err) };
+    }
+    process.stdout.write(REPLY_PREFIX + JSON.stringify(result) + "\n");
+  });
+});
+
+rl.on("close", () => {
+  queue.then(() => process.exit(0));
+});
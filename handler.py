@@ -10,53 +10,219 @@ import requests
 import time
 import os
 import json
-import base64
+import binascii
+import select
+import socket
+import struct
 import subprocess
 import shutil
+import tempfile
+import threading
 import boto3
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson for the large response/request bodies; stdlib json if it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
 
 # S3 configuration from environment
 S3_BUCKET = os.environ.get("S3_BUCKET", "endure-media")
 S3_TEXTURES_PREFIX = os.environ.get("S3_TEXTURES_PREFIX", "avatar-textures/")
 S3_CLOTHING_PREFIX = os.environ.get("S3_CLOTHING_PREFIX", "avatars/")
 AWS_REGION = os.environ.get("AWS_REGION", "us-west-1")
+# Let botocore skip region resolution for any client/session created later
+os.environ.setdefault("AWS_DEFAULT_REGION", AWS_REGION)
+
+# Persistent Node worker that runs the fused pre-rig pipeline (weld+simplify+resize) as one job
+GLTF_WORKER_SCRIPT = os.environ.get("GLTF_WORKER_SCRIPT", "/opt/gltf-worker/gltf-worker.mjs")
+GLTF_TRANSFORM_TIMEOUT = 120
+# Worker replies are framed with this prefix; any other stdout line is just logged
+GLTF_WORKER_REPLY_PREFIX = b"@gltf-worker "
+
+# Meshes already below both limits skip pre-rig optimization entirely
+PRE_RIG_SKIP_MAX_BYTES = 3_000_000
+PRE_RIG_SKIP_MAX_VERTICES = 40_000
+
+# Large meshes are fetched as parallel byte ranges of this size
+MESH_DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+MESH_DOWNLOAD_WORKERS = 8
+
+# Max concurrent S3 PUTs when uploading extracted textures
+TEXTURE_UPLOAD_WORKERS = 16
+
+# Decoded textures above this size spill from memory to a temp file
+TEXTURE_SPOOL_MAX_SIZE = 2 * 1024 * 1024
+# base64 is decoded in slices of this many chars (must be a multiple of 4)
+BASE64_DECODE_CHUNK_SIZE = 1024 * 1024
+
+# Multipart settings for rigged model / clothing uploads (FBX and raw GLB can be 29MB+)
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+# Shared HTTP session for all outbound HTTP (lives for the whole worker)
+# Reuses pooled connections instead of a fresh socket (and TLS handshake) per call
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+))
+# Mesh downloads (FAL/S3/etc) - sized for the parallel ranged GETs
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+))
+
+# comfyui-api is on localhost: connecting should be instant, the workflow itself can take minutes
+COMFYUI_CONNECT_TIMEOUT = 2
+COMFYUI_READ_TIMEOUT = 300
+
+# No adapter-level retries for comfyui-api: health probes are paced by wait_for_api itself,
+# and a workflow POST should fail within COMFYUI_CONNECT_TIMEOUT instead of retrying with backoff
+COMFYUI_ADDRESS = ("localhost", 3000)
+COMFYUI_URL = "http://localhost:3000"
+COMFYUI_HEALTH_URL = f"{COMFYUI_URL}/health"
+SESSION.mount(f"{COMFYUI_URL}/", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
 
 # Initialize S3 client (will use IAM role or env credentials)
+# Shared by the upload threads: built once under a lock, then read lock-free
 s3_client = None
+s3_client_lock = threading.Lock()
 def get_s3_client():
     global s3_client
-    if s3_client is None:
-        s3_client = boto3.client(
-            's3',
-            region_name=AWS_REGION,
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-        )
+    if s3_client is not None:
+        return s3_client
+    with s3_client_lock:
+        if s3_client is None:
+            s3_client = boto3.client(
+                's3',
+                region_name=AWS_REGION,
+                aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+                # Pool sized above upload concurrency so threads don't wait on connections
+                config=Config(
+                    max_pool_connections=32,
+                    s3={'use_accelerate_endpoint': False},
+                    retries={'max_attempts': 5, 'mode': 'adaptive'},
+                    tcp_keepalive=True,
+                ),
+            )
     return s3_client
 
 
 def wait_for_api(max_wait=120):
     """Wait for the comfyui-api server to be ready"""
     start = time.time()
+    delay = 0.05
     while time.time() - start < max_wait:
         try:
-            r = requests.get("http://localhost:3000/health", timeout=5)
+            # Cheap TCP check first - no point building an HTTP request while the port is closed
+            socket.create_connection(COMFYUI_ADDRESS, timeout=0.2).close()
+            r = SESSION.get(COMFYUI_HEALTH_URL, timeout=1)
             if r.status_code == 200:
                 return True
         except:
             pass
-        time.sleep(2)
+        # Localhost probes are cheap: start fast, back off to avoid spinning on slow boots
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
     return False
 
 
+def upload_texture_to_s3(texture: dict, model_id: str) -> tuple:
+    """
+    Upload a single extracted texture to S3 (runs on an upload worker thread).
+
+    Args:
+        texture: Texture dict with 'local_path' or 'data_base64'
+        model_id: Unique identifier for the model (used in S3 path)
+
+    Returns:
+        Tuple of (s3_key, size_in_bytes), or None if the texture has no data
+    """
+    client = get_s3_client()
+
+    # Generate S3 key
+    name = texture.get('name', 'texture')
+    s3_key = f"{S3_TEXTURES_PREFIX}{model_id}/{name}.png"
+
+    # Texture already on disk - upload the file, nothing to decode
+    local_path = texture.get('local_path')
+    if local_path:
+        texture_size = os.path.getsize(local_path)
+        client.upload_file(
+            local_path,
+            S3_BUCKET,
+            s3_key,
+            ExtraArgs={'ContentType': 'image/png'},
+            Config=S3_TRANSFER_CONFIG,
+        )
+        return s3_key, texture_size
+
+    # Pop the base64 payload so the parsed dict stops holding it
+    data_b64 = texture.pop('data_base64', '')
+    if not data_b64:
+        return None
+
+    # Decode base64 in fixed-size slices into a spooled file: small textures stay in
+    # memory, large ones spill to disk, so a full decoded copy never sits next to the
+    # base64 str. a2b_base64 reads each ASCII slice in place (no bytes re-encode).
+    texture_data = tempfile.SpooledTemporaryFile(max_size=TEXTURE_SPOOL_MAX_SIZE)
+    try:
+        # Bound once outside the per-slice loop
+        decode = binascii.a2b_base64
+        write = texture_data.write
+        step = BASE64_DECODE_CHUNK_SIZE
+        try:
+            for start in range(0, len(data_b64), step):
+                write(decode(data_b64[start:start + step]))
+        except binascii.Error:
+            # Slices only line up with 4-char groups in unbroken base64; anything with
+            # embedded whitespace (e.g. line-wrapped) is decoded whole, as b64decode would
+            texture_data.seek(0)
+            texture_data.truncate()
+            write(decode(data_b64))
+        del data_b64
+        texture_size = texture_data.tell()
+        texture_data.seek(0)
+
+        client.upload_fileobj(
+            texture_data,
+            S3_BUCKET,
+            s3_key,
+            ExtraArgs={'ContentType': 'image/png'},
+            Config=S3_TRANSFER_CONFIG,
+        )
+    finally:
+        texture_data.close()
+    return s3_key, texture_size
+
+
 def upload_textures_to_s3(textures_json: str, model_id: str) -> list:
     """
     Upload extracted textures to S3.
 
+    Each texture dict carries either 'local_path' (file written by the node,
+    uploaded straight from disk) or legacy 'data_base64' (decoded in memory).
+
     Args:
-        textures_json: JSON string containing list of texture dicts with base64 data
+        textures_json: JSON string containing list of texture dicts
         model_id: Unique identifier for the model (used in S3 path)
 
     Returns:
@@ -65,56 +231,42 @@ def upload_textures_to_s3(textures_json: str, model_id: str) -> list:
     if not textures_json or textures_json == '[]':
         return []
 
-    try:
-        textures = json.loads(textures_json)
-    except json.JSONDecodeError:
-        print(f"[Handler] Failed to parse textures JSON")
-        return []
-
-    if not textures:
-        return []
-
     uploaded = []
-    client = get_s3_client()
-
-    for texture in textures:
+    with ThreadPoolExecutor(max_workers=TEXTURE_UPLOAD_WORKERS) as executor:
+        # Each worker decodes and uploads one texture
+        futures = {}
+        submit = executor.submit
         try:
+            for texture in json_loads(textures_json):
+                futures[submit(upload_texture_to_s3, texture, model_id)] = texture
+        except ValueError:
+            print(f"[Handler] Failed to parse textures JSON")
+
+        # Uploads run concurrently; results are collected in submission order so
+        # texture_urls keeps the input order
+        for future, texture in futures.items():
             name = texture.get('name', 'texture')
-            data_b64 = texture.get('data_base64', '')
-            texture_type = texture.get('type', 'unknown')
-
-            if not data_b64:
-                continue
-
-            # Decode base64 data
-            texture_data = base64.b64decode(data_b64)
+            try:
+                result = future.result()
+                if result is None:
+                    continue
+                s3_key, texture_size = result
 
-            # Generate S3 key
-            s3_key = f"{S3_TEXTURES_PREFIX}{model_id}/{name}.png"
+                # Generate URL
+                s3_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
 
-            # Upload to S3
-            client.put_object(
-                Bucket=S3_BUCKET,
-                Key=s3_key,
-                Body=texture_data,
-                ContentType='image/png',
-            )
-
-            # Generate URL
-            s3_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
+                uploaded.append({
+                    'name': name,
+                    'type': texture.get('type', 'unknown'),
+                    'url': s3_url,
+                    'width': texture.get('width'),
+                    'height': texture.get('height'),
+                })
 
-            uploaded.append({
-                'name': name,
-                'type': texture_type,
-                'url': s3_url,
-                'width': texture.get('width'),
-                'height': texture.get('height'),
-            })
+                print(f"[Handler] Uploaded texture: {s3_key} ({texture_size} bytes)")
 
-            print(f"[Handler] Uploaded texture: {s3_key} ({len(texture_data)} bytes)")
-
-        except Exception as e:
-            print(f"[Handler] Failed to upload texture {name}: {e}")
+            except Exception as e:
+                print(f"[Handler] Failed to upload texture {name}: {e}")
 
     return uploaded
 
@@ -131,7 +283,10 @@ def upload_rigged_model_to_s3(local_path: str, model_id: str, file_type: str) ->
     Returns:
         S3 URL of uploaded file, or empty string on failure
     """
-    if not local_path or not os.path.exists(local_path):
+    # One stat for both the existence check and the size used in the log
+    try:
+        file_size = os.stat(local_path).st_size
+    except (OSError, TypeError, ValueError):
         print(f"[Handler] Rigged model file not found: {local_path}")
         return ""
 
@@ -141,25 +296,22 @@ def upload_rigged_model_to_s3(local_path: str, model_id: str, file_type: str) ->
         # Generate S3 key: avatars/rigged/{model_id}.{file_type}
         s3_key = f"avatars/rigged/{model_id}.{file_type}"
 
-        # Read file
-        with open(local_path, 'rb') as f:
-            file_data = f.read()
-
         # Determine content type
         content_type = 'model/gltf-binary' if file_type == 'glb' else 'application/octet-stream'
 
-        # Upload to S3
-        client.put_object(
+        # Upload to S3 (multipart above the threshold)
+        client.upload_file(
+            Filename=local_path,
             Bucket=S3_BUCKET,
             Key=s3_key,
-            Body=file_data,
-            ContentType=content_type,
+            ExtraArgs={'ContentType': content_type},
+            Config=S3_TRANSFER_CONFIG,
         )
 
         # Generate URL
         s3_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
 
-        print(f"[Handler] Uploaded rigged model: {s3_key} ({len(file_data)} bytes)")
+        print(f"[Handler] Uploaded rigged model: {s3_key} ({file_size} bytes)")
         return s3_url
 
     except Exception as e:
@@ -185,37 +337,100 @@ def find_output_files(model_id: str, output_dir: str = "/opt/ComfyUI/output") ->
         print(f"[Handler] Output directory not found: {output_dir}")
         return glb_path, fbx_path
 
-    # Look for files matching the model_id pattern
-    for filename in os.listdir(output_dir):
-        filepath = os.path.join(output_dir, filename)
-        if not os.path.isfile(filepath):
-            continue
-
-        # Match files containing the model_id
-        if model_id in filename:
-            if filename.endswith('.glb'):
-                glb_path = filepath
-                print(f"[Handler] Found GLB: {filepath}")
-            elif filename.endswith('.fbx'):
-                fbx_path = filepath
-                print(f"[Handler] Found FBX: {filepath}")
-
-    # If no exact match, try to find most recent files
-    if not glb_path or not fbx_path:
-        import glob
-        glb_files = sorted(glob.glob(os.path.join(output_dir, "*.glb")), key=os.path.getmtime, reverse=True)
-        fbx_files = sorted(glob.glob(os.path.join(output_dir, "*.fbx")), key=os.path.getmtime, reverse=True)
-
-        if not glb_path and glb_files:
-            glb_path = glb_files[0]
-            print(f"[Handler] Using most recent GLB: {glb_path}")
-        if not fbx_path and fbx_files:
-            fbx_path = fbx_files[0]
-            print(f"[Handler] Using most recent FBX: {fbx_path}")
+    # Common case: outputs are named after model_id - two stats, regardless of directory size.
+    # model_id comes from the request, so only a plain file name may be joined onto
+    # output_dir; anything else could point outside it and goes through the scan below.
+    if model_id and os.path.basename(model_id) == model_id:
+        glb_candidate = os.path.join(output_dir, f"{model_id}.glb")
+        fbx_candidate = os.path.join(output_dir, f"{model_id}.fbx")
+        if os.path.isfile(glb_candidate) and os.path.isfile(fbx_candidate):
+            print(f"[Handler] Found GLB: {glb_candidate}")
+            print(f"[Handler] Found FBX: {fbx_candidate}")
+            return glb_candidate, fbx_candidate
+
+    # Outputs were renamed - single directory pass. DirEntry caches the file type (from
+    # the directory read) and stat result, so no per-entry syscalls beyond one stat.
+    # Track the newest file matching the model_id pattern and the newest file overall,
+    # per extension.
+    matched = {'.glb': (-1.0, ""), '.fbx': (-1.0, "")}
+    newest = {'.glb': (-1.0, ""), '.fbx': (-1.0, "")}
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            ext = entry.name[-4:]
+            if ext not in newest or not entry.is_file(follow_symlinks=False):
+                continue
+
+            mtime = entry.stat().st_mtime
+            if mtime > newest[ext][0]:
+                newest[ext] = (mtime, entry.path)
+            if model_id in entry.name and mtime > matched[ext][0]:
+                matched[ext] = (mtime, entry.path)
+
+    glb_path = matched['.glb'][1]
+    fbx_path = matched['.fbx'][1]
+    if glb_path:
+        print(f"[Handler] Found GLB: {glb_path}")
+    if fbx_path:
+        print(f"[Handler] Found FBX: {fbx_path}")
+
+    # If no exact match, use the most recent files
+    if not glb_path and newest['.glb'][1]:
+        glb_path = newest['.glb'][1]
+        print(f"[Handler] Using most recent GLB: {glb_path}")
+    if not fbx_path and newest['.fbx'][1]:
+        fbx_path = newest['.fbx'][1]
+        print(f"[Handler] Using most recent FBX: {fbx_path}")
 
     return glb_path, fbx_path
 
 
+def download_byte_range(url: str, fd: int, start: int, end: int):
+    """Fetch bytes start..end (inclusive) of url and write them at the same offset in fd"""
+    with SESSION.get(url, headers={'Range': f'bytes={start}-{end}'}, timeout=120, stream=True) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RuntimeError(f"Range request ignored (status {response.status_code})")
+
+        offset = start
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+
+    if offset != end + 1:
+        raise RuntimeError(f"Short range read: got {offset - start} of {end - start + 1} bytes")
+
+
+def download_byte_ranges(url: str, output_path: str, total_size: int):
+    """
+    Download url as parallel ranged GETs, each written at its offset in a pre-sized file.
+
+    Raises on the first failed range; ranges that haven't started yet are cancelled.
+
+    Args:
+        url: URL that supports byte-range requests
+        output_path: File to write
+        total_size: Content length of the resource
+    """
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, total_size)
+        with ThreadPoolExecutor(max_workers=MESH_DOWNLOAD_WORKERS) as executor:
+            futures = [
+                executor.submit(download_byte_range, url, fd, start,
+                                min(start + MESH_DOWNLOAD_CHUNK_SIZE, total_size) - 1)
+                for start in range(0, total_size, MESH_DOWNLOAD_CHUNK_SIZE)
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        os.close(fd)
+
+
 def download_mesh_from_url(mesh_url: str, output_dir: str = "/opt/ComfyUI/input") -> str:
     """
     Download mesh from URL to local file for pre-processing.
@@ -233,22 +448,52 @@ def download_mesh_from_url(mesh_url: str, output_dir: str = "/opt/ComfyUI/input"
     try:
         os.makedirs(output_dir, exist_ok=True)
 
-        # Extract filename from URL or generate one
-        parsed = urlparse(mesh_url)
-        filename = os.path.basename(parsed.path) or f"mesh_{int(time.time())}.glb"
+        # Extract filename from URL (drop query/fragment, keep last path segment) or generate one
+        tail = mesh_url.split('#', 1)[0].split('?', 1)[0].rsplit('/', 1)[-1]
+        filename = tail or f"mesh_{int(time.time())}.glb"
         if not filename.endswith('.glb'):
             filename += '.glb'
 
         output_path = os.path.join(output_dir, f"downloaded_{filename}")
 
         print(f"[Handler] Downloading mesh: {mesh_url}")
-        response = requests.get(mesh_url, timeout=120)
-        response.raise_for_status()
 
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+        # Probe for range support; presigned GET URLs typically reject HEAD, which
+        # just means we take the single-stream path
+        download_url = mesh_url
+        total_size = 0
+        try:
+            head = SESSION.head(mesh_url, timeout=30, allow_redirects=True)
+            if (head.ok and head.headers.get('Accept-Ranges') == 'bytes'
+                    and not head.headers.get('Content-Encoding')):
+                download_url = head.url
+                total_size = int(head.headers.get('Content-Length', 0))
+        except Exception as e:
+            print(f"[Handler] Mesh HEAD failed, using single download: {e}")
+
+        downloaded = False
+        if total_size > MESH_DOWNLOAD_CHUNK_SIZE:
+            try:
+                download_byte_ranges(download_url, output_path, total_size)
+                downloaded = True
+            except Exception as e:
+                # Range support was advertised but didn't hold up - drop the partial
+                # file and take the single-stream path instead
+                print(f"[Handler] Ranged mesh download failed, retrying as single download: {e}")
+                try:
+                    os.remove(output_path)
+                except OSError:
+                    pass
+
+        if not downloaded:
+            # Single stream, copied to disk in 1MB blocks so the body is never fully resident
+            with SESSION.get(mesh_url, timeout=120, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
 
-        print(f"[Handler] Downloaded mesh: {output_path} ({len(response.content):,} bytes)")
+        print(f"[Handler] Downloaded mesh: {output_path} ({os.path.getsize(output_path):,} bytes)")
         return output_path
 
     except Exception as e:
@@ -256,6 +501,192 @@ def download_mesh_from_url(mesh_url: str, output_dir: str = "/opt/ComfyUI/input"
         return ""
 
 
+# Started at boot (or lazily), then kept alive across jobs so Node.js boots once per container.
+# One request/response pair at a time: the lock keeps jobs from interleaving on the pipes.
+gltf_worker = None
+gltf_worker_lock = threading.Lock()
+# Bytes read from the worker's stdout that don't yet form a complete line
+gltf_worker_buffer = b""
+def get_gltf_worker():
+    global gltf_worker, gltf_worker_buffer
+    if gltf_worker is not None and gltf_worker.poll() is None:
+        return gltf_worker
+
+    gltf_worker = None
+    gltf_worker_buffer = b""
+    if not os.path.exists(GLTF_WORKER_SCRIPT):
+        return None
+
+    try:
+        # Unbuffered binary pipes: replies are read straight off the fd, so select()
+        # never misses data already pulled into a Python-side buffer
+        gltf_worker = subprocess.Popen(
+            ['node', GLTF_WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+        )
+        print(f"[Handler] Started gltf-transform worker (pid={gltf_worker.pid})")
+    except Exception as e:
+        print(f"[Handler] Failed to start gltf-transform worker: {e}")
+    return gltf_worker
+
+
+def stop_gltf_worker():
+    """Kill the gltf-transform worker so the next call starts a fresh one"""
+    global gltf_worker
+    if gltf_worker is not None:
+        try:
+            gltf_worker.kill()
+            gltf_worker.wait(timeout=5)
+        except Exception:
+            pass
+        gltf_worker = None
+
+
+def read_gltf_worker_reply(worker, timeout: float) -> dict:
+    """
+    Read the worker's stdout until a framed reply line arrives.
+
+    Lines without GLTF_WORKER_REPLY_PREFIX (library output that slipped through)
+    are logged and skipped.
+
+    Args:
+        worker: Running gltf worker process
+        timeout: Seconds to wait for the reply
+
+    Returns:
+        Parsed reply dict
+    """
+    global gltf_worker_buffer
+    fd = worker.stdout.fileno()
+    deadline = time.time() + timeout
+    while True:
+        while b"\n" in gltf_worker_buffer:
+            line, gltf_worker_buffer = gltf_worker_buffer.split(b"\n", 1)
+            if line.startswith(GLTF_WORKER_REPLY_PREFIX):
+                return json.loads(line[len(GLTF_WORKER_REPLY_PREFIX):])
+            if line.strip():
+                print(f"[Handler] gltf-worker output: {line.decode('utf-8', 'replace')}")
+
+        remaining = deadline - time.time()
+        ready, _, _ = select.select([fd], [], [], max(remaining, 0))
+        if not ready:
+            raise TimeoutError(f"no response after {timeout}s")
+
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise RuntimeError("worker exited")
+        gltf_worker_buffer += chunk
+
+
+def run_in_gltf_worker(steps: list, input_path: str, output_path: str) -> bool:
+    """
+    Apply gltf-transform steps to a GLB inside the persistent Node worker.
+
+    All steps run on one in-memory document, so the GLB is parsed and
+    written once no matter how many steps there are. On failure the caller
+    runs the steps through run_gltf_transform_cli instead.
+
+    Args:
+        steps: List of (command, args) tuples, e.g. [('simplify', ['--ratio', '0.10'])]
+        input_path: GLB to read
+        output_path: GLB to write
+
+    Returns:
+        True if output_path was written; False if the worker is unavailable or the job failed
+    """
+    label = '+'.join(command for command, _ in steps)
+    job = {
+        'steps': [{'command': command, 'args': args} for command, args in steps],
+        'input': input_path,
+        'output': output_path,
+    }
+
+    with gltf_worker_lock:
+        worker = get_gltf_worker()
+        if worker is None:
+            return False
+
+        print(f"[Handler] gltf-worker: {label} {input_path} -> {output_path}")
+        try:
+            worker.stdin.write(json.dumps(job).encode() + b"\n")
+
+            reply = read_gltf_worker_reply(worker, GLTF_TRANSFORM_TIMEOUT)
+            if reply.get('ok') and os.path.exists(output_path):
+                return True
+            print(f"[Handler] gltf-worker {label} error: {reply.get('error')}")
+
+        except Exception as e:
+            print(f"[Handler] gltf-worker {label} failed: {e}")
+            stop_gltf_worker()
+
+    return False
+
+
+def run_gltf_transform_cli(command: str, input_path: str, output_path: str, args: list = None) -> bool:
+    """
+    Run a gltf-transform command by spawning the one-shot gltf-transform CLI.
+
+    Args:
+        command: gltf-transform command name
+        input_path: GLB to read
+        output_path: GLB to write
+        args: Extra CLI flags, e.g. ['--ratio', '0.10']
+
+    Returns:
+        True if output_path was written successfully
+    """
+    # Progress output is discarded; stderr is only decoded when the command fails
+    cmd = ['gltf-transform', command, input_path, output_path] + (args or [])
+    print(f"[Handler] Running: {' '.join(cmd)}")
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        close_fds=True,
+        cwd=os.path.dirname(input_path) or None,
+        timeout=GLTF_TRANSFORM_TIMEOUT,
+    )
+    if result.returncode != 0:
+        print(f"[Handler] {command} failed (rc={result.returncode}): {result.stderr.decode('utf-8', 'replace')}")
+        return False
+
+    return os.path.exists(output_path)
+
+
+def count_glb_vertices(path: str) -> int:
+    """
+    Count mesh vertices in a GLB by reading only its header and JSON chunk.
+
+    Args:
+        path: Path to GLB file
+
+    Returns:
+        Sum of POSITION accessor counts over all mesh primitives, or -1 if the
+        file isn't a readable GLB
+    """
+    try:
+        with open(path, 'rb') as f:
+            # 12-byte header (magic, version, length), then the JSON chunk header
+            magic, _, _ = struct.unpack('<III', f.read(12))
+            chunk_length, chunk_type = struct.unpack('<II', f.read(8))
+            if magic != 0x46546C67 or chunk_type != 0x4E4F534A:  # 'glTF', 'JSON'
+                return -1
+            gltf = json_loads(f.read(chunk_length))
+    except (OSError, struct.error, ValueError):
+        return -1
+
+    accessors = gltf.get('accessors', [])
+    vertex_count = 0
+    for mesh in gltf.get('meshes', []):
+        for primitive in mesh.get('primitives', []):
+            position = primitive.get('attributes', {}).get('POSITION')
+            if position is not None and position < len(accessors):
+                vertex_count += accessors[position].get('count', 0)
+    return vertex_count
+
+
 def optimize_glb_before_rigging(input_path: str, output_path: str = None) -> str:
     """
     PRE-RIGGING optimization: simplify mesh + resize textures.
@@ -281,30 +712,22 @@ def optimize_glb_before_rigging(input_path: str, output_path: str = None) -> str
 
     try:
         original_size = os.path.getsize(input_path)
-        print(f"[Handler] Pre-rig optimization starting: {input_path} ({original_size:,} bytes)")
 
-        base_dir = os.path.dirname(input_path)
-        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        # Short-circuit: small file with few vertices has nothing worth simplifying or resizing
+        if original_size < PRE_RIG_SKIP_MAX_BYTES:
+            vertex_count = count_glb_vertices(input_path)
+            if 0 <= vertex_count < PRE_RIG_SKIP_MAX_VERTICES:
+                print(f"[Handler] Pre-rig optimization skipped: {input_path} already light ({original_size:,} bytes, {vertex_count:,} verts)")
+                return input_path
 
-        # Temp files for intermediate steps
-        temp_welded = os.path.join(base_dir, f"{base_name}_welded.glb")
-        temp_simplified = os.path.join(base_dir, f"{base_name}_simplified.glb")
+        print(f"[Handler] Pre-rig optimization starting: {input_path} ({original_size:,} bytes)")
 
         # =====================================================================
         # Step 1: WELD — merge duplicate/near-duplicate vertices
         # gltf-transform docs: "For best results, apply a weld operation
         # before simplification."
         # =====================================================================
-        cmd = ['gltf-transform', 'weld', input_path, temp_welded]
-        print(f"[Handler] Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        print(f"[Handler] weld stdout: {result.stdout}")
-        if result.stderr:
-            print(f"[Handler] weld stderr: {result.stderr}")
-
-        if result.returncode != 0 or not os.path.exists(temp_welded):
-            print(f"[Handler] weld failed (rc={result.returncode}), using original")
-            temp_welded = input_path
+        weld_args = []
 
         # =====================================================================
         # Step 2: SIMPLIFY — reduce vertex count for mobile
@@ -314,54 +737,64 @@ def optimize_glb_before_rigging(input_path: str, output_path: str = None) -> str
         # NOTE: --error 1 allows up to 100% geometric error, ensuring we
         # actually hit the target ratio instead of stopping early
         # =====================================================================
-        cmd = [
-            'gltf-transform', 'simplify',
-            temp_welded, temp_simplified,
+        simplify_args = [
             '--ratio', '0.10',
             '--error', '1'  # Don't limit by error - hit the target ratio
         ]
-        print(f"[Handler] Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        print(f"[Handler] simplify stdout: {result.stdout}")
-        if result.stderr:
-            print(f"[Handler] simplify stderr: {result.stderr}")
-
-        if result.returncode != 0 or not os.path.exists(temp_simplified):
-            print(f"[Handler] simplify failed (rc={result.returncode}), using welded")
-            temp_simplified = temp_welded
 
         # =====================================================================
         # Step 3: RESIZE TEXTURES — 4096×4096 → 1024×1024
         # Huge texture savings with minimal visual loss on mobile screens
         # =====================================================================
-        cmd = [
-            'gltf-transform', 'resize',
-            temp_simplified, output_path,
+        resize_args = [
             '--width', '1024',
             '--height', '1024'
         ]
-        print(f"[Handler] Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        print(f"[Handler] resize stdout: {result.stdout}")
-        if result.stderr:
-            print(f"[Handler] resize stderr: {result.stderr}")
 
-        if result.returncode != 0 or not os.path.exists(output_path):
-            print(f"[Handler] resize failed (rc={result.returncode}), using simplified")
-            shutil.copy2(temp_simplified, output_path)
+        steps = [('weld', weld_args), ('simplify', simplify_args), ('resize', resize_args)]
+
+        # Preferred: all three steps on one in-memory document in the gltf worker
+        # (one GLB parse + write, no intermediate files)
+        if not run_in_gltf_worker(steps, input_path, output_path):
+            # Straight to the CLI: the worker just failed this job (and may have been
+            # killed on a timeout), so retrying each step there could cost another timeout each
+            print(f"[Handler] Fused pre-rig pipeline unavailable, running steps individually")
+
+            base_dir = os.path.dirname(input_path)
+            base_name = os.path.splitext(os.path.basename(input_path))[0]
+
+            # Temp files for intermediate steps
+            temp_welded = os.path.join(base_dir, f"{base_name}_welded.glb")
+            temp_simplified = os.path.join(base_dir, f"{base_name}_simplified.glb")
+
+            if not run_gltf_transform_cli('weld', input_path, temp_welded, weld_args):
+                print(f"[Handler] weld failed, using original")
+                temp_welded = input_path
+
+            if not run_gltf_transform_cli('simplify', temp_welded, temp_simplified, simplify_args):
+                print(f"[Handler] simplify failed, using welded")
+                temp_simplified = temp_welded
+
+            if not run_gltf_transform_cli('resize', temp_simplified, output_path, resize_args):
+                print(f"[Handler] resize failed, using simplified")
+                if temp_simplified != input_path:
+                    # Intermediate file on the same filesystem: rename instead of copying
+                    os.replace(temp_simplified, output_path)
+                else:
+                    shutil.copy2(temp_simplified, output_path)
+
+            # Cleanup temp files
+            for f in [temp_welded, temp_simplified]:
+                if f != input_path and f != output_path:
+                    try:
+                        os.remove(f)
+                    except OSError:
+                        pass
 
         final_size = os.path.getsize(output_path)
         reduction = (1 - final_size / original_size) * 100 if original_size > 0 else 0
         print(f"[Handler] Pre-rig optimization done: {original_size:,} -> {final_size:,} bytes ({reduction:.0f}% reduction)")
 
-        # Cleanup temp files
-        for f in [temp_welded, temp_simplified]:
-            if f != input_path and f != output_path and os.path.exists(f):
-                try:
-                    os.remove(f)
-                except:
-                    pass
-
         return output_path
 
     except Exception as e:
@@ -383,7 +816,8 @@ def compress_rigged_glb(input_path: str, output_path: str = None) -> str:
 
     Args:
         input_path: Path to rigged GLB from UniRig/MIA
-        output_path: Path to write GLB
+        output_path: Path to write GLB (optional - without it the input is
+            returned as-is, since uploads read straight from the path)
 
     Returns:
         Path to output file
@@ -391,16 +825,18 @@ def compress_rigged_glb(input_path: str, output_path: str = None) -> str:
     if not input_path or not os.path.exists(input_path):
         return input_path
 
-    if not output_path:
-        output_path = input_path.replace('.glb', '_final.glb')
-
     try:
         original_size = os.path.getsize(input_path)
         print(f"[Handler] V27 TEST: Skipping Draco compression to isolate crash cause")
         print(f"[Handler] Input: {input_path} ({original_size:,} bytes)")
 
-        # Just copy the file without Draco compression
-        shutil.copy2(input_path, output_path)
+        # Nothing is transformed, so only copy when the caller asked for a separate file
+        if not output_path or output_path == input_path:
+            print(f"[Handler] Output (no Draco): {input_path} (unchanged)")
+            return input_path
+
+        # copyfile uses os.sendfile on Linux - the copy stays in the kernel
+        shutil.copyfile(input_path, output_path)
 
         final_size = os.path.getsize(output_path)
         print(f"[Handler] Output (no Draco): {output_path} ({final_size:,} bytes)")
@@ -430,7 +866,10 @@ def upload_clothing_to_s3(local_path: str, user_id: str, garment_id: str) -> str
     Returns:
         S3 URL of uploaded file
     """
-    if not os.path.exists(local_path):
+    # One stat for both the existence check and the size used in the log
+    try:
+        file_size = os.stat(local_path).st_size
+    except (OSError, TypeError, ValueError):
         print(f"[Handler] Clothing file not found: {local_path}")
         return ""
 
@@ -440,22 +879,19 @@ def upload_clothing_to_s3(local_path: str, user_id: str, garment_id: str) -> str
         # Generate S3 key: avatars/{user_id}/clothing/{garment_id}.glb
         s3_key = f"{S3_CLOTHING_PREFIX}{user_id}/clothing/{garment_id}.glb"
 
-        # Read file
-        with open(local_path, 'rb') as f:
-            file_data = f.read()
-
-        # Upload to S3
-        client.put_object(
+        # Upload to S3 (multipart above the threshold)
+        client.upload_file(
+            Filename=local_path,
             Bucket=S3_BUCKET,
             Key=s3_key,
-            Body=file_data,
-            ContentType='model/gltf-binary',
+            ExtraArgs={'ContentType': 'model/gltf-binary'},
+            Config=S3_TRANSFER_CONFIG,
         )
 
         # Generate URL
         s3_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
 
-        print(f"[Handler] Uploaded clothing: {s3_key} ({len(file_data)} bytes)")
+        print(f"[Handler] Uploaded clothing: {s3_key} ({file_size} bytes)")
         return s3_url
 
     except Exception as e:
@@ -463,6 +899,183 @@ def upload_clothing_to_s3(local_path: str, user_id: str, garment_id: str) -> str
         return ""
 
 
+# textures_json extractor per node output type (returns None if the node has none)
+TEXTURES_JSON_EXTRACTORS = {
+    # Dict output keyed by name - popped; the handler puts it back if no texture uploads
+    dict: lambda node_output: node_output.pop('textures_json', None),
+    # Output is [fbx_path, glb_path, textures_json]
+    list: lambda node_output: node_output[2] if len(node_output) >= 3 else None,
+}
+
+
+# Keys that may hold the clothing GLB path in dict-shaped node outputs
+CLOTHING_PATH_KEYS = ('rigged_garment_path', 'combined_path', 'output_path')
+
+
+def extract_outputs(api_response: dict) -> dict:
+    """
+    Walk a comfyui-api response once and pull out everything the handler needs.
+
+    textures_json is popped from whichever dict holds it; that dict is returned as
+    'textures_owner' so the payload can be put back if no texture uploads succeed.
+
+    Args:
+        api_response: Parsed JSON response (direct or nested outputs format)
+
+    Returns:
+        Dict with 'textures_json', 'textures_owner' and 'clothing_glb' (None when not present)
+    """
+    # Direct output format
+    extracted = {
+        'textures_json': api_response.pop('textures_json', None),
+        'textures_owner': api_response,
+        'clothing_glb': None,
+    }
+    if extracted['textures_json'] is None:
+        extracted['textures_owner'] = None
+
+    # Nested outputs format
+    outputs = api_response.get('outputs')
+    if not isinstance(outputs, dict):
+        return extracted
+
+    for node_output in outputs.values():
+        if extracted['textures_json'] is None:
+            extract = TEXTURES_JSON_EXTRACTORS.get(type(node_output))
+            if extract is not None:
+                extracted['textures_json'] = extract(node_output)
+                if extracted['textures_json'] is not None and isinstance(node_output, dict):
+                    extracted['textures_owner'] = node_output
+
+        if extracted['clothing_glb'] is None:
+            # TransferSkinWeights returns (rigged_garment_path,)
+            # CombineAvatarClothing returns (combined_path,)
+            if isinstance(node_output, list):
+                candidates = node_output[:1]
+            elif isinstance(node_output, dict):
+                candidates = [node_output[key] for key in CLOTHING_PATH_KEYS if key in node_output]
+            else:
+                candidates = []
+            for output_path in candidates:
+                if isinstance(output_path, str) and output_path.endswith('.glb'):
+                    extracted['clothing_glb'] = output_path
+                    break
+
+        if extracted['textures_json'] is not None and extracted['clothing_glb'] is not None:
+            break
+
+    return extracted
+
+
+def prepare_rig_input(input_data: dict) -> str:
+    """
+    V26 PRE-OPTIMIZATION: Download and optimize mesh BEFORE UniRig.
+
+    This reduces 203k verts → ~30k verts so UniRig outputs a mobile-friendly mesh.
+    Rewrites input_data["mesh_url"] to the local pre-optimized file.
+
+    Args:
+        input_data: Workflow input from the request body (modified in place)
+
+    Returns:
+        Path to the pre-optimized mesh, or None if nothing was prepared
+    """
+    mesh_url = input_data.get("mesh_url", "")
+    if not mesh_url:
+        return None
+
+    print(f"[Handler] V26: Pre-optimizing mesh before rigging")
+
+    # Step 1: Download the mesh
+    downloaded_path = download_mesh_from_url(mesh_url)
+    if not downloaded_path:
+        return None
+
+    # Step 2: Pre-optimize (weld + simplify + resize textures)
+    optimized_input_path = downloaded_path.replace('.glb', '_preopt.glb')
+    optimized_input_path = optimize_glb_before_rigging(downloaded_path, optimized_input_path)
+
+    # Step 3: Replace mesh_url with local file path for ComfyUI
+    # The UniRigLoadMesh node supports local file paths
+    input_data["mesh_url"] = optimized_input_path
+    print(f"[Handler] V26: Using pre-optimized mesh: {optimized_input_path}")
+    return optimized_input_path
+
+
+def handle_rig_outputs(api_response: dict, context: dict):
+    """Upload rig-avatar GLB and FBX outputs to S3 and add their URLs to the response"""
+    executor = context['executor']
+    model_id = context['model_id']
+    optimized_input_path = context['prepared_path']
+    print(f"[Handler] Processing rig-avatar workflow for model: {model_id}")
+
+    # Find output files in the ComfyUI output directory
+    glb_path, fbx_path = find_output_files(model_id)
+
+    # FBX upload can start right away
+    fbx_future = None
+    if fbx_path:
+        fbx_future = executor.submit(upload_rigged_model_to_s3, fbx_path, model_id, "fbx")
+
+    glb_future = None
+    if glb_path:
+        # V26: Post-rig compression (Draco only, mesh already small from pre-opt)
+        # The mesh was decimated BEFORE rigging, so no skin data corruption risk
+        # Compression and its upload run as one chained task alongside the FBX upload
+        glb_future = executor.submit(
+            lambda: upload_rigged_model_to_s3(compress_rigged_glb(glb_path), model_id, "glb")
+        )
+
+        # Cleanup pre-optimized input file if it exists
+        if optimized_input_path and os.path.exists(optimized_input_path):
+            try:
+                os.remove(optimized_input_path)
+            except:
+                pass
+
+    # Collect S3 URLs
+    glb_url = glb_future.result() if glb_future else ""
+    fbx_url = fbx_future.result() if fbx_future else ""
+
+    # Update response with S3 URLs
+    # Set directly on api_response so Go backend finds them at output["response"]["glb_output_path"]
+    api_response['glb_output_path'] = glb_url
+    api_response['fbx_output_path'] = fbx_url
+
+    print(f"[Handler] V26 Rig workflow complete - GLB: {glb_url}, FBX: {fbx_url}")
+
+
+def handle_clothing_outputs(api_response: dict, context: dict):
+    """Upload the fitted/rigged clothing GLB to S3 and add its URL to the response"""
+    output_path = context['extracted']['clothing_glb']
+    if not output_path:
+        return
+    user_id = context['user_id']
+    garment_id = context['garment_id']
+
+    # Upload to S3
+    clothing_url = upload_clothing_to_s3(output_path, user_id, garment_id)
+    if not clothing_url:
+        return
+    print(f"[Handler] Clothing uploaded: {clothing_url}")
+
+    # Add clothing URL to response
+    api_response['clothing_url'] = clothing_url
+    api_response['user_id'] = user_id
+    api_response['garment_id'] = garment_id
+
+
+# Workflow-specific stages, keyed by workflow name (last endpoint path segment):
+#   prepare(input_data) -> path     runs before the comfyui-api call
+#   process(api_response, context)  runs on the JSON response, alongside texture uploads;
+#                                   context holds executor, extracted, model_id, user_id,
+#                                   garment_id and prepared_path - each stage reads what it needs
+WORKFLOW_HANDLERS = {
+    'rig-avatar': (prepare_rig_input, handle_rig_outputs),
+    'fit-clothing': (None, handle_clothing_outputs),
+}
+
+
 def handler(job):
     """
     RunPod handler function.
@@ -504,38 +1117,20 @@ def handler(job):
     user_id = input_data.get("user_id", "anonymous")
     garment_id = input_data.get("garment_id", model_id)
 
-    # Check if this is a clothing workflow
-    is_clothing_workflow = "fit-clothing" in endpoint
-
-    # Check if this is a rig-avatar workflow - needs pre-optimization
-    is_rig_workflow = "rig-avatar" in endpoint
-
-    # =========================================================================
-    # V26 PRE-OPTIMIZATION: Download and optimize mesh BEFORE UniRig
-    # This reduces 203k verts → ~30k verts so UniRig outputs a mobile-friendly mesh
-    # =========================================================================
-    optimized_input_path = None
-    if is_rig_workflow:
-        mesh_url = input_data.get("mesh_url", "")
-        if mesh_url:
-            print(f"[Handler] V26: Pre-optimizing mesh before rigging")
-
-            # Step 1: Download the mesh
-            downloaded_path = download_mesh_from_url(mesh_url)
-            if downloaded_path:
-                # Step 2: Pre-optimize (weld + simplify + resize textures)
-                optimized_input_path = downloaded_path.replace('.glb', '_preopt.glb')
-                optimized_input_path = optimize_glb_before_rigging(downloaded_path, optimized_input_path)
-
-                # Step 3: Replace mesh_url with local file path for ComfyUI
-                # The UniRigLoadMesh node supports local file paths
-                body["input"]["mesh_url"] = optimized_input_path
-                print(f"[Handler] V26: Using pre-optimized mesh: {optimized_input_path}")
+    # Workflow-specific stages (rig-avatar pre-optimizes its mesh, etc.)
+    workflow = endpoint.rstrip('/').rsplit('/', 1)[-1]
+    prepare, process = WORKFLOW_HANDLERS.get(workflow, (None, None))
+    prepared_path = prepare(input_data) if prepare else None
 
     # Make request to local comfyui-api
     try:
-        url = f"http://localhost:3000{endpoint}"
-        response = requests.post(url, json=body, timeout=300)
+        url = f"{COMFYUI_URL}{endpoint}"
+        response = SESSION.post(
+            url,
+            data=json_dumps(body),
+            headers={'Content-Type': 'application/json'},
+            timeout=(COMFYUI_CONNECT_TIMEOUT, COMFYUI_READ_TIMEOUT),
+        )
 
         result = {
             "status": "success",
@@ -543,117 +1138,43 @@ def handler(job):
         }
 
         # Parse response
-        if response.headers.get("content-type", "").startswith("application/json"):
-            api_response = response.json()
-
-            # Check if response contains textures to upload
-            # The comfyui-api returns node outputs, need to find textures_json
-            textures_json = None
-
-            # Handle different response formats from comfyui-api
-            if isinstance(api_response, dict):
-                # Direct output format
-                if 'textures_json' in api_response:
-                    textures_json = api_response['textures_json']
-                # Nested outputs format
-                elif 'outputs' in api_response:
-                    outputs = api_response['outputs']
-                    if isinstance(outputs, dict):
-                        for node_id, node_output in outputs.items():
-                            if isinstance(node_output, dict) and 'textures_json' in node_output:
-                                textures_json = node_output['textures_json']
-                                break
-                            elif isinstance(node_output, list) and len(node_output) >= 3:
-                                # Output is [fbx_path, glb_path, textures_json]
-                                textures_json = node_output[2] if len(node_output) > 2 else None
-                                break
-
-            # Upload textures if we found any
-            texture_urls = []
-            if textures_json and textures_json != '[]':
-                print(f"[Handler] Found textures to upload for model: {model_id}")
-                texture_urls = upload_textures_to_s3(textures_json, model_id)
-
-            # Add texture URLs to response
-            if texture_urls:
-                if isinstance(api_response, dict):
-                    api_response['texture_urls'] = texture_urls
-                    # Remove large base64 data from response
-                    if 'textures_json' in api_response:
-                        del api_response['textures_json']
-                    if 'outputs' in api_response and isinstance(api_response['outputs'], dict):
-                        for node_id in api_response['outputs']:
-                            if isinstance(api_response['outputs'][node_id], dict):
-                                api_response['outputs'][node_id].pop('textures_json', None)
-
-            # Handle rig-avatar workflow - upload GLB and FBX to S3
-            if is_rig_workflow:
-                print(f"[Handler] Processing rig-avatar workflow for model: {model_id}")
-
-                # Find output files in the ComfyUI output directory
-                glb_path, fbx_path = find_output_files(model_id)
-
-                # Upload to S3 and get URLs
-                glb_url = ""
-                fbx_url = ""
-
-                if glb_path:
-                    # V26: Post-rig compression (Draco only, mesh already small from pre-opt)
-                    # The mesh was decimated BEFORE rigging, so no skin data corruption risk
-                    compressed_glb = compress_rigged_glb(glb_path)
-                    glb_url = upload_rigged_model_to_s3(compressed_glb, model_id, "glb")
-
-                    # Cleanup pre-optimized input file if it exists
-                    if optimized_input_path and os.path.exists(optimized_input_path):
-                        try:
-                            os.remove(optimized_input_path)
-                        except:
-                            pass
-
-                if fbx_path:
-                    fbx_url = upload_rigged_model_to_s3(fbx_path, model_id, "fbx")
-
-                # Update response with S3 URLs
-                # Set directly on api_response so Go backend finds them at output["response"]["glb_output_path"]
-                if isinstance(api_response, dict):
-                    api_response['glb_output_path'] = glb_url
-                    api_response['fbx_output_path'] = fbx_url
-
-                print(f"[Handler] V26 Rig workflow complete - GLB: {glb_url}, FBX: {fbx_url}")
-
-            # Handle clothing workflow outputs - upload GLB to S3
-            if is_clothing_workflow and isinstance(api_response, dict):
-                clothing_url = None
-
-                # Find clothing output path in response
-                if 'outputs' in api_response and isinstance(api_response['outputs'], dict):
-                    for node_id, node_output in api_response['outputs'].items():
-                        # TransferSkinWeights returns (rigged_garment_path,)
-                        # CombineAvatarClothing returns (combined_path,)
-                        if isinstance(node_output, list) and len(node_output) > 0:
-                            output_path = node_output[0]
-                            if isinstance(output_path, str) and output_path.endswith('.glb'):
-                                # Upload to S3
-                                clothing_url = upload_clothing_to_s3(output_path, user_id, garment_id)
-                                if clothing_url:
-                                    print(f"[Handler] Clothing uploaded: {clothing_url}")
-                                break
-                        elif isinstance(node_output, dict):
-                            # Check for path keys
-                            for key in ['rigged_garment_path', 'combined_path', 'output_path']:
-                                if key in node_output:
-                                    output_path = node_output[key]
-                                    if isinstance(output_path, str) and output_path.endswith('.glb'):
-                                        clothing_url = upload_clothing_to_s3(output_path, user_id, garment_id)
-                                        if clothing_url:
-                                            print(f"[Handler] Clothing uploaded: {clothing_url}")
-                                        break
-
-                # Add clothing URL to response
-                if clothing_url:
-                    api_response['clothing_url'] = clothing_url
-                    api_response['user_id'] = user_id
-                    api_response['garment_id'] = garment_id
+        content_type = response.headers.get("content-type", "")
+        if content_type.startswith("application/json"):
+            api_response = json_loads(response.content)
+            is_dict_response = isinstance(api_response, dict)
+
+            # One pass over the node outputs for textures_json and workflow output paths
+            extracted = extract_outputs(api_response) if is_dict_response else {}
+            textures_json = extracted.get('textures_json')
+
+            # Texture and workflow output uploads don't depend on each other, so overlap them
+            # with the GLB post-processing instead of running everything serially
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                # Upload textures if we found any
+                texture_future = None
+                if textures_json and textures_json != '[]':
+                    print(f"[Handler] Found textures to upload for model: {model_id}")
+                    texture_future = executor.submit(upload_textures_to_s3, textures_json, model_id)
+
+                # Workflow outputs (rig GLB/FBX, clothing GLB) upload alongside the textures
+                if process is not None and is_dict_response:
+                    process(api_response, {
+                        'executor': executor,
+                        'extracted': extracted,
+                        'model_id': model_id,
+                        'user_id': user_id,
+                        'garment_id': garment_id,
+                        'prepared_path': prepared_path,
+                    })
+
+                texture_urls = texture_future.result() if texture_future else []
+
+            # Add texture URLs to response; the base64 payload only stays out of the
+            # response once it has been replaced by uploaded URLs
+            if texture_urls and is_dict_response:
+                api_response['texture_urls'] = texture_urls
+            elif textures_json is not None and extracted.get('textures_owner') is not None:
+                extracted['textures_owner']['textures_json'] = textures_json
 
             result["response"] = api_response
         else:
@@ -661,8 +1182,10 @@ def handler(job):
 
         return result
 
+    except requests.exceptions.ConnectTimeout:
+        return {"status": "error", "error": f"Could not connect to ComfyUI API within {COMFYUI_CONNECT_TIMEOUT} seconds"}
     except requests.exceptions.Timeout:
-        return {"status": "error", "error": "Request timed out after 300 seconds"}
+        return {"status": "error", "error": f"Request timed out after {COMFYUI_READ_TIMEOUT} seconds"}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -672,6 +1195,10 @@ if __name__ == "__main__":
     print("Waiting for ComfyUI API to be ready...")
     if wait_for_api():
         print("ComfyUI API ready, starting RunPod handler...")
+        # Build the S3 client and boot the gltf worker now so the first job doesn't pay for them
+        get_s3_client()
+        with gltf_worker_lock:
+            get_gltf_worker()
         runpod.serverless.start({"handler": handler})
     else:
         print("ERROR: ComfyUI API failed to start")